@@ -70,7 +70,9 @@ def create_app(testing=False):
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', config.SECRET_KEY)
     app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_DATABASE_URI
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = config.SQLALCHEMY_ENGINE_OPTIONS
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['PASSWORD_HASH_METHOD'] = config.PASSWORD_HASH_METHOD
     
     # Cache static assets (CSS/JS/images) for 1 week; PWA service worker handles updates
     app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 604800  # 7 days in seconds
@@ -184,9 +184,9 @@ def _get_library_stats():
 
 def _get_queue_stats():
     """Active and queued download counts."""
-    from app.services.queue_service import queue_service
+    from app.services.queue_service import queue_service, ACTIVE_STATUSES
     all_data = queue_service.get_all()
-    active_count = len([d for d in all_data.get('active', []) if d.get('status') in ('downloading', 'pending', 'processing')])
+    active_count = sum(1 for d in all_data.get('active', []) if d.get('status') in ACTIVE_STATUSES)
     return {
         'queued': all_data.get('total', 0),
         'active': active_count,
@@ -209,41 +209,56 @@ class Download(db.Model):
             cls.duration,
         ).all()
 
-        by_video_id = {}
-        by_title = {}
-        by_title_artist = {}
-
+        cache = {
+            'count': len(records),
+            'by_video_id': {},
+            'by_title': {},
+            'by_title_artist': {},
+        }
         for row in records:
-            title_norm = cls._normalize_title(row.title)
-            artist_norm = cls._normalize_artist(row.artist)
-            duration_val = cls._duration_value(row.duration)
-
-            entry = {
-                'id': row.id,
-                'video_id': row.video_id,
-                'title_norm': title_norm,
-                'artist_norm': artist_norm,
-                'filename': row.filename,
-                'filename_stem_norm': cls._normalize_filename_stem(row.filename),
-                'duration': duration_val,
-            }
-
-            video_id = (row.video_id or '').strip()
-            if video_id and not video_id.startswith('local_'):
-                by_video_id.setdefault(video_id, []).append(entry)
-
-            if title_norm:
-                by_title.setdefault(title_norm, []).append(entry)
-                if artist_norm:
-                    by_title_artist.setdefault((title_norm, artist_norm), []).append(entry)
+            cls._index_duplicate_entry(cache, row)
+        return cache
 
-        return {
-            'count': len(records),
-            'by_video_id': by_video_id,
-            'by_title': by_title,
-            'by_title_artist': by_title_artist,
+    @classmethod
+    def _index_duplicate_entry(cls, cache, row):
+        """Add one record to the duplicate index lookup tables."""
+        title_norm = cls._normalize_title(row.title)
+        artist_norm = cls._normalize_artist(row.artist)
+
+        entry = {
+            'id': row.id,
+            'video_id': row.video_id,
+            'title_norm': title_norm,
+            'artist_norm': artist_norm,
+            'filename': row.filename,
+            'filename_stem_norm': cls._normalize_filename_stem(row.filename),
+            'duration': cls._duration_value(row.duration),
         }
 
+        video_id = (row.video_id or '').strip()
+        if video_id and not video_id.startswith('local_'):
+            cache['by_video_id'].setdefault(video_id, []).append(entry)
+
+        if title_norm:
+            cache['by_title'].setdefault(title_norm, []).append(entry)
+            if artist_norm:
+                cache['by_title_artist'].setdefault((title_norm, artist_norm), []).append(entry)
+
+    @classmethod
+    def _extend_duplicate_cache(cls, row):
+        """
+        Index a newly inserted record in place.
+
+        Avoids rebuilding the whole index (a full table scan) after every
+        completed download, e.g. once per track of a playlist.
+        """
+        with cls._dup_cache_lock:
+            if cls._dup_cache is None:
+                return
+            cls._index_duplicate_entry(cls._dup_cache, row)
+            cls._dup_cache['count'] += 1
+            cls._dup_cache_count += 1
+
     @classmethod
     def _ensure_duplicate_cache(cls):
         current_count = cls.query.count()
@@ -480,7 +495,7 @@ class Download(db.Model):
             download = cls(**kwargs)
             db.session.add(download)
             db.session.commit()
-            cls.invalidate_duplicate_cache()
+            cls._extend_duplicate_cache(download)
             return download
         except Exception as e:
             print(f"Error adding download: {e}")
@@ -87,9 +87,41 @@ class Settings(db.Model):
         return settings
     
     @classmethod
-    def update_all(cls, data):
-        """Update multiple settings at once."""
+    def rows_for(cls, keys):
+        """Load the stored rows for known setting keys in one query."""
+        keys = [key for key in keys if key in cls.DEFAULTS]
+        if not keys:
+            return {}
+        return {row.key: row for row in cls.query.filter(cls.key.in_(keys)).all()}
+
+    @classmethod
+    def changed_values(cls, data, rows=None):
+        """Return the subset of data whose values differ from what is stored."""
+        if rows is None:
+            rows = cls.rows_for(data)
+        changes = {}
         for key, value in data.items():
-            if key in cls.DEFAULTS:
-                cls.set(key, value)
+            if key not in cls.DEFAULTS:
+                continue
+            row = rows.get(key)
+            stored = row.value if row else cls.DEFAULTS[key]
+            if stored != str(value):
+                changes[key] = str(value)
+        return changes
+
+    @classmethod
+    def update_all(cls, data, rows=None):
+        """Update multiple settings at once in a single commit."""
+        keys = [key for key in data if key in cls.DEFAULTS]
+        if rows is None:
+            rows = cls.rows_for(keys)
+        for key in keys:
+            value = str(data[key])
+            row = rows.get(key)
+            if row:
+                row.value = value
+            else:
+                db.session.add(cls(key=key, value=value))
+        if keys:
+            db.session.commit()
         return cls.get_all()
@@ -4,6 +4,7 @@ User model for authentication and role-based access control.
 
 from datetime import datetime
 
+from flask import current_app
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -35,7 +36,9 @@ class User(UserMixin, db.Model):
 
     def set_password(self, password):
         """Hash and store password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(
+            password, method=current_app.config['PASSWORD_HASH_METHOD']
+        )
 
     def check_password(self, password):
         """Verify password against stored hash."""
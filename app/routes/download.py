@@ -2,19 +2,20 @@
 Download Routes - Single downloads and playlist downloads.
 """
 
+import json
 import os
+import queue
 import re
-import threading
 from datetime import datetime
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, Response, jsonify, request, current_app
 from flask_login import current_user
 from sqlalchemy import func
 
 from app.auth.decorators import admin_required
 from app.utils import is_valid_url
 from app.services.youtube import YouTubeService
-from app.services.queue_service import queue_service
+from app.services.queue_service import queue_service, TERMINAL_STATUSES
 from app.storage_paths import get_download_dir
 from app.download_preferences import (
     get_default_download_preferences,
@@ -144,12 +145,7 @@ def start_download():
     job_id = queue_service.create_download(url, audio_format, quality)
 
     app = current_app._get_current_object()
-    thread = threading.Thread(
-        target=_background_download,
-        args=(app, job_id, url, audio_format, quality, info),
-        daemon=True
-    )
-    thread.start()
+    queue_service.submit(_background_download, app, job_id, url, audio_format, quality, info)
 
     return jsonify({'job_id': job_id})
 
@@ -334,6 +330,37 @@ def get_status(job_id: str):
     return jsonify(download)
 
 
+@bp.route('/api/events/<job_id>')
+@admin_required
+def stream_status(job_id: str):
+    """Push download status updates as Server-Sent Events until the job ends."""
+    if not queue_service.get_download(job_id):
+        return jsonify({'error': 'Job not found'}), 404
+
+    subscriber = queue_service.subscribe(job_id)
+
+    def event_stream():
+        try:
+            while True:
+                try:
+                    payload = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"data: {json.dumps(payload)}\n\n"
+                if payload.get('status') in TERMINAL_STATUSES:
+                    return
+        finally:
+            queue_service.unsubscribe(job_id, subscriber)
+
+    return Response(
+        event_stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
 @bp.route('/api/downloads')
 @admin_required
 def list_downloads():
@@ -364,12 +391,7 @@ def start_playlist_download():
     session['owner_user_id'] = current_user.id
 
     app = current_app._get_current_object()
-    thread = threading.Thread(
-        target=_background_playlist_download,
-        args=(app, session_id),
-        daemon=True
-    )
-    thread.start()
+    queue_service.submit_playlist(_background_playlist_download, app, session_id)
 
     return jsonify({'session_id': session_id})
 
@@ -75,7 +75,7 @@ def _set_prefs_cookie(response, all_prefs):
     if cookie_data:
         response.set_cookie(
             'zora_prefs',
-            json.dumps(cookie_data),
+            json.dumps(cookie_data, separators=(',', ':')),  # compact JSON keeps the cookie small
             max_age=365 * 24 * 3600,   # 1 year
             httponly=False,              # Frontend reads this
             samesite='Lax',
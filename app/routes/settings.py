@@ -20,36 +20,37 @@ def get_settings():
     return jsonify(settings)
 
 
+# Writable settings mapped to the normalizer applied before storage
+_SETTINGS_FIELDS = {
+    'default_format': str,
+    'default_quality': str,
+    'check_duplicates': lambda value: str(value).lower(),
+    'skip_duplicates': lambda value: str(value).lower(),
+    'download_dir': lambda value: str(value or '').strip(),
+    'playlist_preview_limit': lambda value: str(Settings.normalize_preview_limit(value)),
+}
+
+
 @bp.route('/settings', methods=['POST'])
 @admin_required
 def update_settings():
-    """Update settings."""
+    """Update settings, skipping the write when nothing changed."""
     data = request.get_json(silent=True) or {}
 
-    settings_data = {}
-    if 'default_format' in data:
-        settings_data['default_format'] = data.get('default_format', 'm4a')
-    if 'default_quality' in data:
-        settings_data['default_quality'] = data.get('default_quality', '320')
-    if 'check_duplicates' in data:
-        settings_data['check_duplicates'] = str(data.get('check_duplicates', True)).lower()
-    if 'skip_duplicates' in data:
-        settings_data['skip_duplicates'] = str(data.get('skip_duplicates', True)).lower()
-    if 'download_dir' in data:
-        settings_data['download_dir'] = str(data.get('download_dir', '') or '').strip()
-    if 'playlist_preview_limit' in data:
-        settings_data['playlist_preview_limit'] = str(
-            Settings.normalize_preview_limit(data.get('playlist_preview_limit'))
-        )
-
-    updated = Settings.update_all(settings_data) if settings_data else Settings.get_all()
+    settings_data = {
+        key: normalize(data[key])
+        for key, normalize in _SETTINGS_FIELDS.items()
+        if key in data
+    }
+    # One SELECT serves both the change check and the update
+    rows = Settings.rows_for(settings_data)
+    changes = Settings.changed_values(settings_data, rows)
+
+    updated = Settings.update_all(changes, rows) if changes else Settings.get_all()
     updated['download_dir'] = str(get_download_dir())
-    if 'playlist_preview_limit' in updated:
-        updated['playlist_preview_limit'] = Settings.normalize_preview_limit(
-            updated.get('playlist_preview_limit')
-        )
 
-    from app.models.audit_log import log_action
-    log_action('SETTINGS_UPDATE', target_type='settings', metadata=settings_data)
+    if changes:
+        from app.models.audit_log import log_action
+        log_action('SETTINGS_UPDATE', target_type='settings', metadata=changes)
 
     return jsonify(updated)
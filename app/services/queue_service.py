@@ -2,14 +2,83 @@
 Queue Service - Background download queue processing.
 """
 
+import logging
 import os
+import queue
 import threading
 import uuid
+from concurrent.futures import Future
 from datetime import datetime, timedelta
 from flask import current_app
 from app.storage_paths import get_download_dir
 from app.download_preferences import get_default_download_preferences
 
+logger = logging.getLogger(__name__)
+
+
+class _DaemonPool:
+    """
+    Fixed-size pool of daemon worker threads.
+
+    Bursts of requests wait for a free worker instead of each spawning a
+    new thread. Unlike ThreadPoolExecutor, whose workers the interpreter
+    joins at exit, daemon workers let Ctrl-C or a service stop exit without
+    waiting for the current download to finish.
+    """
+
+    def __init__(self, max_workers: int, name: str):
+        self._max_workers = max(1, max_workers)
+        self._name = name
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args) -> Future:
+        """Queue fn(*args) and return a Future for its result."""
+        future = Future()
+        self._tasks.put((future, fn, args))
+        with self._lock:
+            if len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    daemon=True,
+                    name=f'{self._name}-{len(self._threads)}',
+                )
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def _work(self):
+        while True:
+            future, fn, args = self._tasks.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+# Single-track downloads and playlist sessions get separate pools so a long
+# playlist can't hold every worker while single tracks wait behind it.
+_executor = _DaemonPool(int(os.getenv('ZORA_WORKERS', '2')), 'dl')
+_playlist_executor = _DaemonPool(int(os.getenv('ZORA_PLAYLIST_WORKERS', '1')), 'dl-playlist')
+
+# Job statuses that still need work vs. ones kept only for retention
+ACTIVE_STATUSES = frozenset({'pending', 'downloading', 'processing'})
+TERMINAL_STATUSES = frozenset({'completed', 'error', 'skipped'})
+
+
+def _log_task_failure(future):
+    """Log a background task's crash; nothing else reads its Future."""
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        logger.error('Background download task failed', exc_info=exc)
+
 
 class QueueService:
     """Thread-safe download queue management."""
@@ -27,21 +96,51 @@ class QueueService:
         """Initialize queue state."""
         self.queue = []
         self.active_downloads = {}
+        self.finished_at = {}  # job_id -> when it last changed in a terminal status
+        self.subscribers = {}  # job_id -> [queue.Queue] of live status streams
         self.queue_lock = threading.Lock()
         self.active_lock = threading.Lock()
-        self.is_processing = False
+        self.queue_ready = threading.Event()
+        self._worker_started = threading.Event()
+        self._app = None
         self.completed_retention_seconds = 120
     
     def _now_str(self) -> str:
         """Return a consistent timestamp string."""
         return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    def _parse_dt(self, value: str):
-        """Parse timestamp strings used by queue records."""
-        try:
-            return datetime.strptime(str(value), '%Y-%m-%d %H:%M:%S')
-        except Exception:
-            return None
+    def _job_changed(self, job_id: str):
+        """
+        Refresh retention for terminal jobs and push the new state to
+        status stream subscribers. Caller holds active_lock.
+        """
+        entry = self.active_downloads[job_id]
+        if entry.get('status') in TERMINAL_STATUSES:
+            self.finished_at[job_id] = datetime.now()
+        else:
+            self.finished_at.pop(job_id, None)
+
+        for subscriber in self.subscribers.get(job_id, ()):
+            subscriber.put_nowait(dict(entry))
+
+    def subscribe(self, job_id: str) -> queue.Queue:
+        """Register a status stream for a job, primed with its current state."""
+        subscriber = queue.Queue()
+        with self.active_lock:
+            self.subscribers.setdefault(job_id, []).append(subscriber)
+            entry = self.active_downloads.get(job_id)
+            if entry:
+                subscriber.put_nowait(dict(entry))
+        return subscriber
+
+    def unsubscribe(self, job_id: str, subscriber: queue.Queue):
+        """Remove a status stream registered with subscribe()."""
+        with self.active_lock:
+            streams = self.subscribers.get(job_id, [])
+            if subscriber in streams:
+                streams.remove(subscriber)
+            if not streams:
+                self.subscribers.pop(job_id, None)
 
     def _set_active_download(self, job_id: str, payload: dict):
         """Create/replace active download entry with updated timestamp."""
@@ -49,6 +148,7 @@ class QueueService:
         entry['updated_at'] = self._now_str()
         with self.active_lock:
             self.active_downloads[job_id] = entry
+            self._job_changed(job_id)
 
     def _patch_active_download(self, job_id: str, **kwargs):
         """Update active download entry and refresh updated timestamp."""
@@ -56,25 +156,21 @@ class QueueService:
             if job_id in self.active_downloads:
                 self.active_downloads[job_id].update(kwargs)
                 self.active_downloads[job_id]['updated_at'] = self._now_str()
+                self._job_changed(job_id)
 
     def _cleanup_finished_downloads(self):
         """Drop terminal jobs after retention to avoid unbounded growth."""
-        cutoff = datetime.now() - timedelta(seconds=self.completed_retention_seconds)
-        stale_ids = []
+        if not self.finished_at:
+            return
 
+        cutoff = datetime.now() - timedelta(seconds=self.completed_retention_seconds)
         with self.active_lock:
-            for job_id, job in self.active_downloads.items():
-                if job.get('status') not in {'completed', 'error', 'skipped'}:
-                    continue
-
-                stamp = self._parse_dt(job.get('updated_at') or job.get('completed_at'))
-                if not stamp:
-                    continue
-
-                if stamp <= cutoff:
-                    stale_ids.append(job_id)
-
+            stale_ids = [
+                job_id for job_id, stamp in self.finished_at.items()
+                if stamp <= cutoff
+            ]
             for job_id in stale_ids:
+                self.finished_at.pop(job_id, None)
                 self.active_downloads.pop(job_id, None)
     
     def add(
@@ -107,16 +203,16 @@ class QueueService:
             'added_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         }
         
-        with self.queue_lock:
-            self.queue.append(item)
-            position = len(self.queue)
-        
-        # Start processing if not already running
         try:
             app = current_app._get_current_object()
         except RuntimeError:
             app = None
         self._start_processing(app)
+
+        with self.queue_lock:
+            self.queue.append(item)
+            position = len(self.queue)
+            self.queue_ready.set()
         
         return {'queue_item': item, 'position': position}
     
@@ -188,26 +284,50 @@ class QueueService:
         """Update download status."""
         self._patch_active_download(job_id, **kwargs)
     
+    def submit(self, fn, *args):
+        """Run a background task on the single-track download pool."""
+        future = _executor.submit(fn, *args)
+        future.add_done_callback(_log_task_failure)
+        return future
+
+    def submit_playlist(self, fn, *args):
+        """Run a playlist session on its own pool, apart from single tracks."""
+        future = _playlist_executor.submit(fn, *args)
+        future.add_done_callback(_log_task_failure)
+        return future
+
     def _start_processing(self, app=None):
-        """Start queue processing thread."""
-        if not self.is_processing:
-            self.is_processing = True
-            thread = threading.Thread(target=self._process_queue, args=(app,), daemon=True)
+        """Start the queue worker thread once; later calls only refresh the app."""
+        if app is not None:
+            self._app = app
+        if self._worker_started.is_set():
+            return
+        with self._lock:
+            if self._worker_started.is_set():
+                return
+            thread = threading.Thread(
+                target=self._process_queue,
+                daemon=True,
+                name='download-queue',
+            )
             thread.start()
+            self._worker_started.set()
     
-    def _process_queue(self, app=None):
-        """Process queue items sequentially."""
+    def _process_queue(self):
+        """Process queue items sequentially, sleeping while the queue is empty."""
         from app.downloader import YTMusicDownloader
         from app.models import Download
         
         while True:
+            self.queue_ready.wait()
             with self.queue_lock:
                 if not self.queue:
-                    self.is_processing = False
-                    return
+                    self.queue_ready.clear()
+                    continue
                 
                 item = self.queue[0]
             
+            app = self._app
             item['status'] = 'downloading'
             job_id = item['id']
 
@@ -8,6 +8,17 @@ from pathlib import Path
 from config import config
 
 
+def _ensure_dir(path: Path) -> Path:
+    """Create a directory if it is missing and return it.
+
+    Checked on every lookup (one stat when it exists) so a directory removed
+    while the app runs, e.g. on external or Termux storage, is recreated.
+    """
+    if not path.is_dir():
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def _normalize_dir(raw_value: str) -> Path:
     """Expand and normalize a configured directory path."""
     value = str(raw_value or '').strip()
@@ -32,9 +43,7 @@ def get_download_dir() -> Path:
     """
     env_override = os.getenv('ZORA_DOWNLOAD_DIR', '').strip()
     if env_override:
-        path = _normalize_dir(env_override)
-        path.mkdir(parents=True, exist_ok=True)
-        return path
+        return _ensure_dir(_normalize_dir(env_override))
 
     db_value = ''
     try:
@@ -44,14 +53,10 @@ def get_download_dir() -> Path:
     except Exception:
         db_value = ''
 
-    path = _normalize_dir(db_value)
-    path.mkdir(parents=True, exist_ok=True)
-    return path
+    return _ensure_dir(_normalize_dir(db_value))
 
 
 def get_thumbnails_dir() -> Path:
     """Resolve thumbnails directory alongside current download directory."""
-    path = get_download_dir() / 'thumbnails'
-    path.mkdir(parents=True, exist_ok=True)
-    return path
+    return _ensure_dir(get_download_dir() / 'thumbnails')
 
@@ -20,6 +20,16 @@ PLAYLIST_PATTERNS = [
     r'[?&]list=[\w-]+',  # Any URL with list parameter
 ]
 
+# Compiled once at import; the validators run on every search/download request
+_YOUTUBE_RES = tuple(re.compile(pattern) for pattern in YOUTUBE_PATTERNS)
+_PLAYLIST_RES = tuple(re.compile(pattern) for pattern in PLAYLIST_PATTERNS)
+
+# Characters not allowed in filenames (plus ASCII control chars) -> '_'
+_FILENAME_TRANSLATION = str.maketrans(
+    dict.fromkeys(map(ord, '<>:"/\\|?*'), '_')
+    | dict.fromkeys(range(0x20), '_')
+)
+
 
 def is_valid_url(url: str) -> bool:
     """
@@ -35,7 +45,10 @@ def is_valid_url(url: str) -> bool:
         return False
     
     url = url.strip()
-    return any(re.match(pattern, url) for pattern in YOUTUBE_PATTERNS)
+    # Every pattern names one of these hosts; skip the regexes when neither is there
+    if 'youtube.com' not in url and 'youtu.be' not in url:
+        return False
+    return any(regex.match(url) for regex in _YOUTUBE_RES)
 
 
 def is_playlist(url: str) -> bool:
@@ -52,7 +65,10 @@ def is_playlist(url: str) -> bool:
         return False
     
     url = url.strip()
-    return any(re.search(pattern, url) for pattern in PLAYLIST_PATTERNS)
+    # Every pattern needs a list parameter
+    if 'list=' not in url:
+        return False
+    return any(regex.search(url) for regex in _PLAYLIST_RES)
 
 
 def extract_playlist_id(url: str) -> str:
@@ -99,16 +115,13 @@ def sanitize_filename(title: str, max_length: int = 200) -> str:
     if not title:
         return "untitled"
     
-    # Characters not allowed in filenames
-    invalid_chars = r'[<>:"/\\|?*\x00-\x1f]'
-    sanitized = re.sub(invalid_chars, '_', title)
+    sanitized = title.translate(_FILENAME_TRANSLATION)
     
     # Remove leading/trailing spaces and dots
     sanitized = sanitized.strip(' .')
     
     # Truncate if too long (leave room for extension)
-    if len(sanitized) > max_length:
-        sanitized = sanitized[:max_length]
+    sanitized = sanitized[:max_length]
     
     return sanitized or "untitled"
 
@@ -123,19 +136,13 @@ def format_duration(seconds) -> str:
     Returns:
         Formatted string like "3:45" or "1:23:45"
     """
-    if seconds is None or seconds < 0:
-        return "0:00"
-    
-    # Convert to int to handle floats
-    seconds = int(seconds)
-    
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    secs = seconds % 60
-    
-    if hours > 0:
-        return f"{hours}:{minutes:02d}:{secs:02d}"
-    return f"{minutes}:{secs:02d}"
+    # None and negatives both come out as "0:00"; int() handles floats
+    hours, rem = divmod(int(max(seconds or 0, 0)), 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+_FILESIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
 
 
 def format_filesize(bytes_size: int) -> str:
@@ -151,12 +158,12 @@ def format_filesize(bytes_size: int) -> str:
     if bytes_size is None or bytes_size < 0:
         return "0 B"
     
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if bytes_size < 1024:
-            return f"{bytes_size:.1f} {unit}"
+    unit = 0
+    while bytes_size >= 1024 and unit < len(_FILESIZE_UNITS) - 1:
         bytes_size /= 1024
+        unit += 1
     
-    return f"{bytes_size:.1f} TB"
+    return f"{bytes_size:.1f} {_FILESIZE_UNITS[unit]}"
 
 
 def ensure_dir(path: str) -> str:
@@ -174,6 +181,12 @@ def ensure_dir(path: str) -> str:
     return abs_path
 
 
+_VIDEO_ID_RES = (
+    re.compile(r'(?:v=|/)([a-zA-Z0-9_-]{11})(?:[&?]|$)'),
+    re.compile(r'youtu\.be/([a-zA-Z0-9_-]{11})'),
+)
+
+
 def extract_video_id(url: str) -> str | None:
     """
     Extract video ID from YouTube URL.
@@ -184,13 +197,8 @@ def extract_video_id(url: str) -> str | None:
     Returns:
         Video ID or None
     """
-    patterns = [
-        r'(?:v=|/)([a-zA-Z0-9_-]{11})(?:[&?]|$)',
-        r'youtu\.be/([a-zA-Z0-9_-]{11})',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for regex in _VIDEO_ID_RES:
+        match = regex.search(url)
         if match:
             return match.group(1)
     
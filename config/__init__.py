@@ -31,6 +31,10 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{DATABASE_PATH}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    
+    # Auth — werkzeug hash method for local passwords (tests use a cheap one)
+    PASSWORD_HASH_METHOD = 'scrypt'
     
     # Download defaults
     DEFAULT_FORMAT = os.getenv('DEFAULT_FORMAT', 'm4a')
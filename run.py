@@ -34,5 +34,17 @@ if __name__ == '__main__':
     """)
     
     # Using port 5001 to avoid conflicts with macOS 'ControlCenter' (AirPlay Receiver)
-    # Disable debug mode to prevent reloader hangs
-    app.run(debug=False, host=host, port=port, threaded=True)
+    if os.getenv('ZORA_DEBUG'):
+        # Werkzeug dev server with debugger; only for local development
+        app.run(debug=True, host=host, port=port, threaded=True)
+    else:
+        try:
+            from waitress import serve
+        except ImportError:
+            serve = None
+
+        if serve:
+            serve(app, host=host, port=port, threads=int(os.getenv('ZORA_THREADS', '8')))
+        else:
+            # Disable debug mode to prevent reloader hangs
+            app.run(debug=False, host=host, port=port, threaded=True)
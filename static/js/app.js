@@ -16,6 +16,7 @@ const State = {
     quality: '320',
     currentJobId: null,
     pollInterval: null,
+    statusStream: null,    // EventSource for live download status
     currentVideo: null,
     lastDownloaded: null,
     downloads: [],
@@ -409,7 +409,65 @@ function showProgress() {
     UI.show('progressSection');
 }
 
+/**
+ * Apply a download status payload to the progress view.
+ * Returns true once the job has finished (completed or failed).
+ */
+function applyDownloadStatus(data) {
+    document.getElementById('progressFill').style.width = `${data.progress || 0}%`;
+    UI.setElement('progressPercent', 'textContent', `${Math.round(data.progress || 0)}%`);
+
+    if (data.speed) UI.setElement('progressSpeed', 'textContent', UI.formatSpeed(data.speed));
+    if (data.eta) UI.setElement('progressEta', 'textContent', UI.formatTime(data.eta));
+    if (data.title) UI.setElement('progressTitle', 'textContent', data.title);
+
+    if (data.status === 'completed') {
+        onDownloadComplete(data);
+        return true;
+    }
+    if (data.status === 'error') {
+        UI.toast(data.error || 'Download failed', 'error');
+        UI.hide('progressSection');
+        return true;
+    }
+    return false;
+}
+
+function stopStatusUpdates() {
+    if (State.pollInterval) {
+        clearInterval(State.pollInterval);
+        State.pollInterval = null;
+    }
+    if (State.statusStream) {
+        State.statusStream.close();
+        State.statusStream = null;
+    }
+}
+
 function startPolling() {
+    stopStatusUpdates();
+
+    // Prefer server push; fall back to polling if the stream is unavailable
+    if (!window.EventSource) {
+        startStatusPolling();
+        return;
+    }
+
+    const stream = new EventSource(`/api/events/${State.currentJobId}`);
+    State.statusStream = stream;
+
+    stream.onmessage = (event) => {
+        if (applyDownloadStatus(JSON.parse(event.data))) stopStatusUpdates();
+    };
+    stream.onerror = () => {
+        if (State.statusStream !== stream) return;
+        stream.close();
+        State.statusStream = null;
+        startStatusPolling();
+    };
+}
+
+function startStatusPolling() {
     if (State.pollInterval) clearInterval(State.pollInterval);
     let consecutivePollErrors = 0;
 
@@ -418,30 +476,13 @@ function startPolling() {
             const data = await API.getStatus(State.currentJobId);
             consecutivePollErrors = 0;
 
-            document.getElementById('progressFill').style.width = `${data.progress || 0}%`;
-            UI.setElement('progressPercent', 'textContent', `${Math.round(data.progress || 0)}%`);
-
-            if (data.speed) UI.setElement('progressSpeed', 'textContent', UI.formatSpeed(data.speed));
-            if (data.eta) UI.setElement('progressEta', 'textContent', UI.formatTime(data.eta));
-            if (data.title) UI.setElement('progressTitle', 'textContent', data.title);
-
-            if (data.status === 'completed') {
-                clearInterval(State.pollInterval);
-                State.pollInterval = null;
-                onDownloadComplete(data);
-            } else if (data.status === 'error') {
-                clearInterval(State.pollInterval);
-                State.pollInterval = null;
-                UI.toast(data.error || 'Download failed', 'error');
-                UI.hide('progressSection');
-            }
+            if (applyDownloadStatus(data)) stopStatusUpdates();
         } catch (error) {
             console.error('Polling error:', error);
             consecutivePollErrors += 1;
 
             if (consecutivePollErrors >= 3) {
-                clearInterval(State.pollInterval);
-                State.pollInterval = null;
+                stopStatusUpdates();
                 UI.hide('progressSection');
                 UI.toast(error.message || 'Download status unavailable', 'error');
             }
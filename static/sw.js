@@ -7,7 +7,7 @@
  *   - Thumbnails (/api/thumbnails/…):    Stale-While-Revalidate
  */
 
-const CACHE_VERSION = 'v7';
+const CACHE_VERSION = 'v8';
 const SHELL_CACHE = `zora-shell-${CACHE_VERSION}`;
 const THUMB_CACHE = `zora-thumbs-${CACHE_VERSION}`;
 const API_CACHE = `zora-api-${CACHE_VERSION}`;
@@ -90,6 +90,11 @@ self.addEventListener('fetch', event => {
 
     // 3. API calls
     if (url.pathname.startsWith('/api/')) {
+        // Server-Sent Event streams — let the browser handle them directly
+        if (url.pathname.startsWith('/api/events/')) {
+            return;
+        }
+
         // Auth endpoints — always network-only, never cache
         if (url.pathname.startsWith('/api/auth/')) {
             event.respondWith(fetch(request));
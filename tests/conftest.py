@@ -0,0 +1,318 @@
+"""
+Shared fixtures for the test suite.
+
+One app (in-memory SQLite) is built and the test users seeded once per
+test session; the client fixtures hand out fresh clients carrying the
+captured session cookie.  Modules that opt into ``db_session`` get every
+test wrapped in a transaction that is rolled back afterwards, so the
+shared database looks the same to each test.
+"""
+
+import contextlib
+import functools
+import logging
+import os
+import sys
+from pathlib import Path
+
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.pool import StaticPool
+
+# Make the project root importable once for every test module
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+TEST_SETTINGS = {
+    'admin_email': 'admin@test.com',
+    'admin_password': 'adminpass1',
+    'secret_key': 'test-secret-key-fixed',
+    # Registers the Google client; the tests mock the provider itself
+    'google_client_id': 'fake-client-id',
+    'google_client_secret': 'fake-client-secret',
+    # Named shared-cache in-memory DB: every connection sees the same tables.
+    # The name is absolute so Flask-SQLAlchemy doesn't anchor it under
+    # instance/; mode=memory means nothing is written to disk.
+    # Under pytest-xdist each worker gets its own database.
+    'database_uri': (
+        'sqlite:///file:/zora_test_{}?mode=memory&cache=shared&uri=true'
+        .format(os.environ.get('PYTEST_XDIST_WORKER', 'main'))
+    ),
+    # Production scrypt costs ~100ms per hash; tests only need it to round-trip
+    'password_hash_method': 'pbkdf2:sha256:1000',
+}
+
+
+@pytest.fixture(scope='session', autouse=True)
+def _ensure_dirs_once():
+    """Every create_app() calls config.ensure_dirs(); only the first needs to mkdir."""
+    from config import config
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(config, 'ensure_dirs', functools.cache(config.ensure_dirs))
+        yield
+
+
+def _freeze(settings):
+    """Turn a flat settings dict into a hashable cache key."""
+    return tuple(sorted(settings.items()))
+
+
+@functools.lru_cache(maxsize=None)
+def _build_app(frozen_settings):
+    """Create (once per distinct settings) an app with an in-memory database."""
+    settings = dict(frozen_settings)
+    tmp_dl = Path(settings['download_dir'])
+
+    from config import config
+    config.DATABASE_PATH = ':memory:'
+    config.SQLALCHEMY_DATABASE_URI = settings['database_uri']
+    config.SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+    config.PASSWORD_HASH_METHOD = settings['password_hash_method']
+    config.DOWNLOAD_DIR = tmp_dl
+    config.THUMBNAILS_DIR = config.DOWNLOAD_DIR / 'thumbnails'
+
+    # Keep SQL logging quiet even if something configures logging verbosely
+    logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
+
+    from app import create_app
+    # These env vars are only read while the app is created, so scope them to that.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('ZORA_ADMIN_EMAIL', settings['admin_email'])
+        mp.setenv('ZORA_ADMIN_PASSWORD', settings['admin_password'])
+        mp.setenv('SECRET_KEY', settings['secret_key'])
+        mp.setenv('GOOGLE_CLIENT_ID', settings['google_client_id'])
+        mp.setenv('GOOGLE_CLIENT_SECRET', settings['google_client_secret'])
+        application = create_app(testing=True)
+    # Flask-SQLAlchemy reads these only in init_app; fail loudly if a config
+    # change ever turns per-query recording or echo on for the test app.
+    assert not application.config['SQLALCHEMY_RECORD_QUERIES']
+    assert not application.config['SQLALCHEMY_ECHO']
+    application.config['PROPAGATE_EXCEPTIONS'] = True
+    return application
+
+
+@pytest.fixture(scope='session')
+def session_monkeypatch():
+    """A MonkeyPatch that lasts for the whole test session."""
+    mp = pytest.MonkeyPatch()
+    yield mp
+    mp.undo()
+
+
+@pytest.fixture(scope='session')
+def app(session_monkeypatch, tmp_path_factory):
+    """The shared app for the whole session."""
+    # Read per request: a developer's .env must not point tests at real
+    # music or switch cookies to Secure-only.
+    session_monkeypatch.delenv('ZORA_DOWNLOAD_DIR', raising=False)
+    session_monkeypatch.delenv('FLASK_ENV', raising=False)
+    # Use a temp dir for downloads so tests don't touch real files
+    tmp_dl = tmp_path_factory.mktemp('downloads')
+    yield _build_app(_freeze({
+        **TEST_SETTINGS,
+        'download_dir': str(tmp_dl),
+    }))
+
+
+# Users seeded straight into the DB; the admin comes from _bootstrap_admin.
+SEEDED_USERS = {
+    'user': {
+        'name': 'Regular User',
+        'email': 'user@test.com',
+        'password': 'userpass1',
+    },
+    # Second regular user for playlist and preference isolation tests
+    'user_b': {
+        'name': 'User B',
+        'email': 'userb@test.com',
+        'password': 'userbpass1',
+    },
+    # Owns the preferences exercised in test_preferences.py
+    'user_a': {
+        'name': 'User A',
+        'email': 'usera@test.com',
+        'password': 'userapass1',
+    },
+    # Logs in over HTTP to pick up the zora_prefs cookie in test_preferences.py
+    'cookie': {
+        'name': 'Cookie Test',
+        'email': 'cookie@test.com',
+        'password': 'cookiepass1',
+    },
+    # Has its password reset in test_password_reset.py
+    'reset': {
+        'name': 'Reset User',
+        'email': 'reset@test.com',
+        'password': 'oldpassword123',
+    },
+}
+
+
+@pytest.fixture(scope='session')
+def seeded_user_ids(app):
+    """Seed the test users once; return ``{identity: user id}``."""
+    from app.models import db, User
+
+    with app.app_context():
+        admin = User.query.filter_by(email=TEST_SETTINGS['admin_email']).one()
+        users = {'admin': admin}
+        for identity, fields in SEEDED_USERS.items():
+            user = User(name=fields['name'], email=fields['email'], role='user',
+                        auth_provider='local', is_active=True)
+            user.set_password(fields['password'])
+            users[identity] = user
+        db.session.add_all(users.values())
+        db.session.commit()
+        return {identity: user.id for identity, user in users.items()}
+
+
+@pytest.fixture(scope='session')
+def admin_id(seeded_user_ids):
+    return seeded_user_ids['admin']
+
+
+@pytest.fixture(scope='session')
+def user_id(seeded_user_ids):
+    return seeded_user_ids['user']
+
+
+@pytest.fixture(scope='session')
+def session_cookies(app, seeded_user_ids):
+    """Mint a Flask-Login session cookie for each seeded identity.
+
+    Signup/login over HTTP is covered by TestAuthRoutes; the other tests only
+    need a cookie that says who they are.
+    """
+    client = app.test_client()
+    cookies = {}
+    for identity, user_id in seeded_user_ids.items():
+        with client.session_transaction() as sess:
+            sess.clear()
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+        cookies[identity] = client.get_cookie('session').value
+    return cookies
+
+
+@pytest.fixture(scope='session')
+def client_for(app, session_cookies):
+    """Factory: a test client carrying ``identity``'s session, or a guest one."""
+    def make(identity=None):
+        client = app.test_client()
+        if identity:
+            client.set_cookie('session', session_cookies[identity])
+        return client
+    return make
+
+
+@pytest.fixture
+def guest(client_for):
+    """Unauthenticated test client."""
+    return client_for()
+
+
+@pytest.fixture
+def client(app):
+    """Fresh test client for tests that log in over HTTP themselves."""
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client_for):
+    """Authenticated admin test client."""
+    return client_for('admin')
+
+
+@pytest.fixture
+def user_client(client_for):
+    """Authenticated regular-user test client."""
+    return client_for('user')
+
+
+@pytest.fixture
+def user_b_client(client_for):
+    """Second regular user for playlist and preference isolation tests."""
+    return client_for('user_b')
+
+
+@pytest.fixture
+def user_a_client(client_for):
+    """Regular user whose preferences test_preferences.py edits."""
+    return client_for('user_a')
+
+
+@pytest.fixture
+def mock_google(monkeypatch):
+    """Swap in a fake Authlib registry; return the mocked Google client."""
+    from app.auth import google
+
+    fake_oauth = MagicMock()
+    mock_client = MagicMock()
+    fake_oauth.create_client.return_value = mock_client
+    monkeypatch.setattr(google, 'oauth', fake_oauth)
+    return mock_client
+
+
+@pytest.fixture
+def google_login(mock_google, client):
+    """Factory: run ``client`` through the Google callback; return the response.
+
+    ``token`` is what the mocked token exchange returns; pass ``raise_exc``
+    to make the exchange fail instead.
+    """
+    def login(token=None, raise_exc=None):
+        if raise_exc:
+            mock_google.authorize_access_token.side_effect = raise_exc
+        else:
+            mock_google.authorize_access_token.return_value = token
+        return client.get('/api/auth/google/callback')
+    return login
+
+
+@contextlib.contextmanager
+def _rolled_back(app):
+    """Run the block against one connection and roll back all it commits.
+
+    The engine is swapped for a single connection with an open transaction,
+    and the session joins it through SAVEPOINTs, so ``db.session.commit()``
+    in request handlers only releases a savepoint.
+    """
+    from app.models import db
+
+    with app.app_context():
+        engines = db.engines
+        engine = engines[None]
+        connection = engine.connect()
+        transaction = connection.begin()
+        # pysqlite defers BEGIN until the first write, and a SAVEPOINT taken
+        # outside a transaction commits on RELEASE — so open it explicitly.
+        connection.exec_driver_sql('BEGIN')
+        engines[None] = connection
+    sessionmaker = db.session.session_factory
+    sessionmaker.configure(join_transaction_mode='create_savepoint')
+
+    try:
+        yield db.session
+    finally:
+        sessionmaker.kw.pop('join_transaction_mode', None)
+        engines[None] = engine
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def db_session(app, seeded_user_ids):
+    """Roll back everything a test commits.
+
+    Depends on seeded_user_ids so the seed is committed before the
+    transaction opens and is never rolled back with it.
+    """
+    with _rolled_back(app) as session:
+        yield session
@@ -9,67 +9,9 @@ Covers:
   - Non-admin access denied
 """
 
-import os
-import sys
-import tempfile
-
 import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-
-@pytest.fixture(scope='module')
-def app():
-    """Create a fresh app with an in-memory database."""
-    os.environ['ZORA_ADMIN_EMAIL'] = 'admin@test.com'
-    os.environ['ZORA_ADMIN_PASSWORD'] = 'adminpass1'
-    os.environ['SECRET_KEY'] = 'test-secret-key-fixed'
-
-    tmp_dl = tempfile.mkdtemp()
-    os.environ['DOWNLOAD_DIR'] = tmp_dl
-
-    from config import config
-    config.DATABASE_PATH = ':memory:'
-    config.SQLALCHEMY_DATABASE_URI = 'sqlite://'
-    config.DOWNLOAD_DIR = __import__('pathlib').Path(tmp_dl)
-    config.THUMBNAILS_DIR = config.DOWNLOAD_DIR / 'thumbnails'
-    config.ensure_dirs()
-
-    from app import create_app
-    application = create_app(testing=True)
-    yield application
-
-
-@pytest.fixture(scope='module')
-def admin_client(app):
-    """Authenticated admin test client."""
-    client = app.test_client()
-    resp = client.post('/api/auth/login', json={
-        'email': 'admin@test.com',
-        'password': 'adminpass1',
-    })
-    assert resp.status_code == 200
-    return client
-
-
-@pytest.fixture(scope='module')
-def user_client(app):
-    """Authenticated regular-user test client."""
-    client = app.test_client()
-    resp = client.post('/api/auth/signup', json={
-        'name': 'Regular User',
-        'email': 'user@test.com',
-        'password': 'userpass1',
-        'confirm_password': 'userpass1',
-    })
-    assert resp.status_code == 201
-    return client
-
-
-@pytest.fixture(scope='module')
-def guest(app):
-    """Unauthenticated test client."""
-    return app.test_client()
+pytestmark = pytest.mark.usefixtures('db_session')
 
 
 # ---------------------------------------------------------------------------
@@ -77,7 +19,7 @@ def guest(app):
 # ---------------------------------------------------------------------------
 
 class TestAuditLogModel:
-    def test_log_action_creates_entry(self, app, admin_client):
+    def test_log_action_creates_entry(self, app, admin_client, admin_id):
         with app.app_context():
             from app.models import AuditLog, db
             from app.models.audit_log import log_action
@@ -91,7 +33,7 @@ class TestAuditLogModel:
             # Manually log an action
             with app.test_request_context():
                 from app.models import User
-                admin = User.query.filter_by(email='admin@test.com').first()
+                admin = db.session.get(User, admin_id)
                 log_action('TEST_ACTION', target_type='test', target_id='1',
                            metadata={'key': 'value'}, user=admin)
 
@@ -99,11 +41,18 @@ class TestAuditLogModel:
             assert entry is not None
             assert entry.target_type == 'test'
             assert entry.target_id == '1'
-            assert entry.actor_user_id == admin.id
+            assert entry.actor_user_id == admin_id
 
-    def test_log_action_to_dict(self, app):
+    def test_log_action_to_dict(self, app, admin_id):
         with app.app_context():
-            from app.models import AuditLog
+            from app.models import AuditLog, User, db
+            from app.models.audit_log import log_action
+
+            with app.test_request_context():
+                admin = db.session.get(User, admin_id)
+                log_action('TEST_ACTION', target_type='test', target_id='1',
+                           metadata={'key': 'value'}, user=admin)
+
             entry = AuditLog.query.filter_by(action='TEST_ACTION').first()
             d = entry.to_dict()
             assert d['action'] == 'TEST_ACTION'
@@ -117,6 +66,8 @@ class TestAuditLogModel:
 # ---------------------------------------------------------------------------
 
 class TestAdminUserManagement:
+    # Role/active changes are undone by the db_session rollback after each test.
+
     def test_guest_cannot_access_admin(self, guest):
         resp = guest.get('/api/admin/users')
         assert resp.status_code == 401
@@ -139,12 +90,8 @@ class TestAdminUserManagement:
         assert data['total'] == 1
         assert data['users'][0]['name'] == 'Regular User'
 
-    def test_admin_get_user(self, app, admin_client):
-        with app.app_context():
-            from app.models import User
-            user = User.query.filter_by(email='user@test.com').first()
-
-        resp = admin_client.get(f'/api/admin/users/{user.id}')
+    def test_admin_get_user(self, admin_client, user_id):
+        resp = admin_client.get(f'/api/admin/users/{user_id}')
         assert resp.status_code == 200
         data = resp.get_json()
         assert data['email'] == 'user@test.com'
@@ -153,62 +100,33 @@ class TestAdminUserManagement:
         resp = admin_client.get('/api/admin/users/99999')
         assert resp.status_code == 404
 
-    def test_admin_change_user_role(self, app, admin_client):
-        with app.app_context():
-            from app.models import User
-            user = User.query.filter_by(email='user@test.com').first()
-            user_id = user.id
-
+    def test_admin_change_user_role(self, admin_client, user_id):
         resp = admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'admin'})
         assert resp.status_code == 200
         assert resp.get_json()['role'] == 'admin'
 
-        # Change back to user
-        resp = admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'user'})
-        assert resp.status_code == 200
-        assert resp.get_json()['role'] == 'user'
-
-    def test_admin_invalid_role(self, app, admin_client):
-        with app.app_context():
-            from app.models import User
-            user = User.query.filter_by(email='user@test.com').first()
-
-        resp = admin_client.patch(f'/api/admin/users/{user.id}', json={'role': 'superadmin'})
+    def test_admin_invalid_role(self, admin_client, user_id):
+        resp = admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'superadmin'})
         assert resp.status_code == 400
 
-    def test_cannot_demote_last_admin(self, app, admin_client):
-        with app.app_context():
-            from app.models import User
-            admin = User.query.filter_by(email='admin@test.com').first()
-
-        resp = admin_client.patch(f'/api/admin/users/{admin.id}', json={'role': 'user'})
+    def test_cannot_demote_last_admin(self, admin_client, admin_id):
+        resp = admin_client.patch(f'/api/admin/users/{admin_id}', json={'role': 'user'})
         assert resp.status_code == 409
         assert 'last admin' in resp.get_json()['error'].lower()
 
-    def test_admin_deactivate_user(self, app, admin_client):
-        with app.app_context():
-            from app.models import User
-            user = User.query.filter_by(email='user@test.com').first()
-            user_id = user.id
-
+    def test_admin_deactivate_user(self, admin_client, user_id):
         resp = admin_client.patch(f'/api/admin/users/{user_id}', json={'is_active': False})
         assert resp.status_code == 200
         assert resp.get_json()['is_active'] is False
 
-        # Reactivate
-        resp = admin_client.patch(f'/api/admin/users/{user_id}', json={'is_active': True})
-        assert resp.status_code == 200
-        assert resp.get_json()['is_active'] is True
-
-    def test_cannot_deactivate_last_admin(self, app, admin_client):
-        with app.app_context():
-            from app.models import User
-            admin = User.query.filter_by(email='admin@test.com').first()
-
-        resp = admin_client.patch(f'/api/admin/users/{admin.id}', json={'is_active': False})
+    def test_cannot_deactivate_last_admin(self, admin_client, admin_id):
+        resp = admin_client.patch(f'/api/admin/users/{admin_id}', json={'is_active': False})
         assert resp.status_code == 409
 
-    def test_role_change_creates_audit_log(self, app, admin_client):
+    def test_role_change_creates_audit_log(self, app, admin_client, user_id):
+        admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'admin'})
+        admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'user'})
+
         with app.app_context():
             from app.models import AuditLog
             logs = AuditLog.query.filter_by(action='USER_ROLE_CHANGE').all()
@@ -228,7 +146,9 @@ class TestAuditLogViewing:
         resp = user_client.get('/api/admin/audit-logs')
         assert resp.status_code == 403
 
-    def test_admin_list_audit_logs(self, admin_client):
+    def test_admin_list_audit_logs(self, admin_client, user_id):
+        admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'user'})
+
         resp = admin_client.get('/api/admin/audit-logs')
         assert resp.status_code == 200
         data = resp.get_json()
@@ -236,15 +156,68 @@ class TestAuditLogViewing:
         assert 'total' in data
         assert data['total'] >= 1
 
-    def test_admin_filter_audit_logs_by_action(self, admin_client):
+    def test_admin_filter_audit_logs_by_action(self, admin_client, user_id):
+        # One entry that matches the filter and one that must be left out
+        admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'user'})
+        admin_client.patch(f'/api/admin/users/{user_id}', json={'is_active': True})
+
         resp = admin_client.get('/api/admin/audit-logs?action=USER_ROLE_CHANGE')
         data = resp.get_json()
+        assert data['logs']
         for log in data['logs']:
             assert log['action'] == 'USER_ROLE_CHANGE'
 
-    def test_audit_log_has_actor_info(self, admin_client):
+    def test_audit_log_has_actor_info(self, admin_client, admin_id, user_id):
+        admin_client.patch(f'/api/admin/users/{user_id}', json={'role': 'user'})
+
         resp = admin_client.get('/api/admin/audit-logs')
         data = resp.get_json()
+        assert data['logs']
         for log in data['logs']:
-            if log['actor_user_id']:
-                assert log['actor_name'] is not None
+            assert log['actor_user_id'] == admin_id
+            assert log['actor_name'] is not None
+
+
+# ---------------------------------------------------------------------------
+# Settings Updates
+# ---------------------------------------------------------------------------
+
+class TestSettingsUpdate:
+    def test_unchanged_settings_skip_write(self, app, admin_client):
+        resp = admin_client.post('/api/settings', json={'default_quality': '256'})
+        assert resp.status_code == 200
+        assert resp.get_json()['default_quality'] == '256'
+
+        resp = admin_client.post('/api/settings', json={'default_quality': '256'})
+        assert resp.status_code == 200
+        assert resp.get_json()['default_quality'] == '256'
+
+        with app.app_context():
+            from app.models import AuditLog
+            logs = AuditLog.query.filter_by(action='SETTINGS_UPDATE').all()
+            assert len(logs) == 1
+
+    def test_change_check_reuses_loaded_rows(self, app):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        from app.models import Settings
+
+        data = {'default_quality': '256', 'theme': 'dark', 'default_format': 'mp3'}
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            Settings.set('default_format', 'mp3')
+            rows = Settings.rows_for(data)
+
+            event.listen(Engine, 'before_cursor_execute', record)
+            try:
+                changes = Settings.changed_values(data, rows)
+            finally:
+                event.remove(Engine, 'before_cursor_execute', record)
+
+        # Stored and default values are compared without another query
+        assert statements == []
+        assert changes == {'default_quality': '256'}
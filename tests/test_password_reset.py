@@ -10,109 +10,87 @@ Covers:
   - Final security checklist items
 """
 
-import os
-import sys
-import tempfile
+import itertools
+import secrets
+from types import SimpleNamespace
 
 import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from config import Config
 
+pytestmark = pytest.mark.usefixtures('db_session')
 
-@pytest.fixture(scope='module')
-def app():
-    """Create a fresh app with an in-memory database."""
-    os.environ['ZORA_ADMIN_EMAIL'] = 'admin@test.com'
-    os.environ['ZORA_ADMIN_PASSWORD'] = 'adminpass1'
-    os.environ['SECRET_KEY'] = 'test-secret-key-fixed'
-
-    tmp_dl = tempfile.mkdtemp()
-    os.environ['DOWNLOAD_DIR'] = tmp_dl
-
-    from config import config
-    config.DATABASE_PATH = ':memory:'
-    config.SQLALCHEMY_DATABASE_URI = 'sqlite://'
-    config.DOWNLOAD_DIR = __import__('pathlib').Path(tmp_dl)
-    config.THUMBNAILS_DIR = config.DOWNLOAD_DIR / 'thumbnails'
-    config.ensure_dirs()
 
-    from app import create_app
-    application = create_app(testing=True)
-    yield application
+@pytest.fixture(scope='session')
+def reset_user_id(seeded_user_ids):
+    """Id of reset@test.com, whose password these tests reset."""
+    return seeded_user_ids['reset']
 
 
-@pytest.fixture(scope='module')
-def admin_client(app):
-    """Authenticated admin test client."""
-    client = app.test_client()
-    resp = client.post('/api/auth/login', json={
-        'email': 'admin@test.com',
-        'password': 'adminpass1',
-    })
-    assert resp.status_code == 200
-    return client
-
+@pytest.fixture
+def fresh_reset_token(app, reset_user_id):
+    """Plain-text reset token just issued for reset@test.com."""
+    with app.app_context():
+        from app.models import User, PasswordResetToken, db
+        user = db.session.get(User, reset_user_id)
+        _, plain_token = PasswordResetToken.create_for_user(user)
+        return plain_token
 
-@pytest.fixture(scope='module')
-def test_user(app):
-    """Create a regular test user for password reset tests."""
-    client = app.test_client()
-    resp = client.post('/api/auth/signup', json={
-        'name': 'Reset User',
-        'email': 'reset@test.com',
-        'password': 'oldpassword123',
-        'confirm_password': 'oldpassword123',
-    })
-    assert resp.status_code == 201
-    return resp.get_json()
 
+@pytest.fixture
+def stub_token_rng(monkeypatch):
+    """Issue predictable reset tokens; tests that only need *a* token use this."""
+    from app.models import password_reset
 
-@pytest.fixture()
-def guest(app):
-    """Unauthenticated test client."""
-    return app.test_client()
+    counter = itertools.count()
+    monkeypatch.setattr(password_reset, 'secrets', SimpleNamespace(
+        token_urlsafe=lambda nbytes: f'reset-token-{next(counter)}'))
 
 
 # ===========================================================================
 # 1. Password Reset Token Model
 # ===========================================================================
 
+@pytest.mark.usefixtures('stub_token_rng')
 class TestPasswordResetTokenModel:
     """Test the PasswordResetToken model."""
 
-    def test_create_token_for_user(self, app, test_user):
+    def test_create_token_for_user_real(self, app, reset_user_id, monkeypatch):
+        """The unstubbed path issues a long random token."""
+        from app.models import password_reset
+
+        # Put the real RNG back over the class-wide stub
+        monkeypatch.setattr(password_reset, 'secrets', secrets)
         with app.app_context():
-            from app.models import User, PasswordResetToken
-            user = User.query.filter_by(email='reset@test.com').first()
+            from app.models import User, PasswordResetToken, db
+            user = db.session.get(User, reset_user_id)
             assert user is not None
 
             token_obj, plain_token = PasswordResetToken.create_for_user(user)
             assert token_obj is not None
             assert plain_token is not None
+            assert not plain_token.startswith('reset-token-')
             assert len(plain_token) > 20
             assert token_obj.user_id == user.id
             assert token_obj.used is False
 
-    def test_validate_valid_token(self, app, test_user):
+    def test_validate_valid_token(self, app, reset_user_id, fresh_reset_token):
         with app.app_context():
-            from app.models import User, PasswordResetToken
-            user = User.query.filter_by(email='reset@test.com').first()
-            _, plain_token = PasswordResetToken.create_for_user(user)
-
-            result = PasswordResetToken.validate_token(plain_token)
+            from app.models import PasswordResetToken
+            result = PasswordResetToken.validate_token(fresh_reset_token)
             assert result is not None
-            assert result.user_id == user.id
+            assert result.user_id == reset_user_id
 
-    def test_validate_invalid_token(self, app, test_user):
+    def test_validate_invalid_token(self, app):
         with app.app_context():
             from app.models import PasswordResetToken
             result = PasswordResetToken.validate_token('bogus-token-value')
             assert result is None
 
-    def test_token_single_use(self, app, test_user):
+    def test_token_single_use(self, app, reset_user_id):
         with app.app_context():
             from app.models import User, PasswordResetToken, db
-            user = User.query.filter_by(email='reset@test.com').first()
+            user = db.session.get(User, reset_user_id)
             token_obj, plain_token = PasswordResetToken.create_for_user(user)
 
             # Mark as used
@@ -122,10 +100,10 @@ class TestPasswordResetTokenModel:
             result = PasswordResetToken.validate_token(plain_token)
             assert result is None
 
-    def test_new_token_invalidates_old(self, app, test_user):
+    def test_new_token_invalidates_old(self, app, reset_user_id):
         with app.app_context():
-            from app.models import User, PasswordResetToken
-            user = User.query.filter_by(email='reset@test.com').first()
+            from app.models import User, PasswordResetToken, db
+            user = db.session.get(User, reset_user_id)
             _, old_token = PasswordResetToken.create_for_user(user)
             _, new_token = PasswordResetToken.create_for_user(user)
 
@@ -134,11 +112,11 @@ class TestPasswordResetTokenModel:
             # New token should be valid
             assert PasswordResetToken.validate_token(new_token) is not None
 
-    def test_expired_token_rejected(self, app, test_user):
+    def test_expired_token_rejected(self, app, reset_user_id):
         with app.app_context():
             from datetime import datetime, timedelta
             from app.models import User, PasswordResetToken, db
-            user = User.query.filter_by(email='reset@test.com').first()
+            user = db.session.get(User, reset_user_id)
             token_obj, plain_token = PasswordResetToken.create_for_user(user)
 
             # Force expiry
@@ -156,7 +134,7 @@ class TestPasswordResetTokenModel:
 class TestPasswordResetRequest:
     """Test POST /api/auth/password/reset/request."""
 
-    def test_request_reset_valid_email(self, guest, test_user):
+    def test_request_reset_valid_email(self, guest):
         resp = guest.post('/api/auth/password/reset/request', json={
             'email': 'reset@test.com',
         })
@@ -177,29 +155,18 @@ class TestPasswordResetRequest:
         resp = guest.post('/api/auth/password/reset/request', json={})
         assert resp.status_code == 400
 
-    def test_request_reset_is_public(self, guest):
-        """Password reset request doesn't require authentication."""
-        resp = guest.post('/api/auth/password/reset/request', json={
-            'email': 'reset@test.com',
-        })
-        assert resp.status_code != 401
-
 
 # ===========================================================================
 # 3. Password Reset Confirm Endpoint
 # ===========================================================================
 
+@pytest.mark.usefixtures('stub_token_rng')
 class TestPasswordResetConfirm:
     """Test POST /api/auth/password/reset/confirm."""
 
-    def test_confirm_reset_success(self, app, guest, test_user):
-        with app.app_context():
-            from app.models import User, PasswordResetToken
-            user = User.query.filter_by(email='reset@test.com').first()
-            _, plain_token = PasswordResetToken.create_for_user(user)
-
+    def test_confirm_reset_success(self, guest, fresh_reset_token):
         resp = guest.post('/api/auth/password/reset/confirm', json={
-            'token': plain_token,
+            'token': fresh_reset_token,
             'new_password': 'newpassword456',
         })
         assert resp.status_code == 200
@@ -220,70 +187,51 @@ class TestPasswordResetConfirm:
         })
         assert resp.status_code == 400
 
-    def test_confirm_reset_short_password(self, app, guest, test_user):
-        with app.app_context():
-            from app.models import User, PasswordResetToken
-            user = User.query.filter_by(email='reset@test.com').first()
-            _, plain_token = PasswordResetToken.create_for_user(user)
-
+    def test_confirm_reset_short_password(self, guest, fresh_reset_token):
         resp = guest.post('/api/auth/password/reset/confirm', json={
-            'token': plain_token,
+            'token': fresh_reset_token,
             'new_password': 'short',
         })
         assert resp.status_code == 400
 
-    def test_confirm_reset_used_token(self, app, guest, test_user):
+    def test_confirm_reset_used_token(self, guest, fresh_reset_token):
         """Token cannot be reused after successful reset."""
-        with app.app_context():
-            from app.models import User, PasswordResetToken
-            user = User.query.filter_by(email='reset@test.com').first()
-            _, plain_token = PasswordResetToken.create_for_user(user)
-
         # First use
         resp1 = guest.post('/api/auth/password/reset/confirm', json={
-            'token': plain_token,
+            'token': fresh_reset_token,
             'new_password': 'firstreset123',
         })
         assert resp1.status_code == 200
 
         # Second use — should fail
         resp2 = guest.post('/api/auth/password/reset/confirm', json={
-            'token': plain_token,
+            'token': fresh_reset_token,
             'new_password': 'secondreset123',
         })
         assert resp2.status_code == 400
 
-    def test_confirm_reset_is_public(self, guest):
-        """Password reset confirm doesn't require authentication."""
-        resp = guest.post('/api/auth/password/reset/confirm', json={
-            'token': 'any-token',
-            'new_password': 'somepassword',
-        })
-        assert resp.status_code != 401
-
 
 # ===========================================================================
 # 4. Security Headers
 # ===========================================================================
 
-class TestSecurityHeaders:
-    """Every response must include security headers."""
-
-    def test_x_content_type_options(self, guest):
-        resp = guest.get('/')
-        assert resp.headers.get('X-Content-Type-Options') == 'nosniff'
+@pytest.fixture(scope='module')
+def root_resp(client_for):
+    """One guest GET / shared by the header checks."""
+    return client_for().get('/')
 
-    def test_x_frame_options(self, guest):
-        resp = guest.get('/')
-        assert resp.headers.get('X-Frame-Options') == 'DENY'
 
-    def test_x_xss_protection(self, guest):
-        resp = guest.get('/')
-        assert resp.headers.get('X-XSS-Protection') == '1; mode=block'
+class TestSecurityHeaders:
+    """Every response must include security headers."""
 
-    def test_referrer_policy(self, guest):
-        resp = guest.get('/')
-        assert resp.headers.get('Referrer-Policy') == 'strict-origin-when-cross-origin'
+    @pytest.mark.parametrize('header,expected', [
+        ('X-Content-Type-Options', 'nosniff'),
+        ('X-Frame-Options', 'DENY'),
+        ('X-XSS-Protection', '1; mode=block'),
+        ('Referrer-Policy', 'strict-origin-when-cross-origin'),
+    ])
+    def test_security_header(self, root_resp, header, expected):
+        assert root_resp.headers.get(header) == expected
 
     def test_headers_on_api_responses(self, guest):
         resp = guest.post('/api/auth/login', json={
@@ -300,13 +248,14 @@ class TestSecurityHeaders:
 class TestSecurityChecklist:
     """Verify key security properties."""
 
-    def test_password_hash_not_in_api_response(self, guest, test_user):
+    def test_password_hash_not_in_api_response(self, guest):
         """User API responses must never expose password_hash."""
         client = guest
         resp = client.post('/api/auth/login', json={
             'email': 'reset@test.com',
-            'password': 'firstreset123',
+            'password': 'oldpassword123',
         })
+        assert resp.status_code == 200
         data = resp.get_json()
         assert 'password_hash' not in data
 
@@ -337,27 +286,36 @@ class TestSecurityChecklist:
         })
         assert resp3.status_code == 403
 
+    def test_password_hash_strength(self, app, monkeypatch):
+        """Outside tests, local passwords get werkzeug's production scrypt hash."""
+        from app.models import User
+
+        # The suite runs with a cheap hash method; put the shipped default back
+        monkeypatch.setitem(app.config, 'PASSWORD_HASH_METHOD', Config.PASSWORD_HASH_METHOD)
+        with app.app_context():
+            user = User()
+            user.set_password('strongpass123')
+        assert user.password_hash.startswith('scrypt:')
+        assert user.check_password('strongpass123')
+        assert not user.check_password('wrongpass123')
+
     def test_session_cookie_config(self, app):
         """Session cookies have security attributes."""
         assert app.config['SESSION_COOKIE_HTTPONLY'] is True
         assert app.config['SESSION_COOKIE_SAMESITE'] == 'Lax'
 
-    def test_password_reset_creates_audit_log(self, app, test_user):
+    def test_password_reset_creates_audit_log(self, app, guest, reset_user_id):
         """Password reset action is recorded in audit logs."""
-        client = app.test_client()
+        from app.models import AuditLog, PasswordResetToken, User, db
 
+        # One app context for issuing the token, the request and the check
         with app.app_context():
-            from app.models import User, PasswordResetToken
-            user = User.query.filter_by(email='reset@test.com').first()
+            user = db.session.get(User, reset_user_id)
             _, plain_token = PasswordResetToken.create_for_user(user)
 
-        resp = client.post('/api/auth/password/reset/confirm', json={
-            'token': plain_token,
-            'new_password': 'auditlogtest1',
-        })
-        assert resp.status_code == 200
-
-        with app.app_context():
-            from app.models import AuditLog
-            log = AuditLog.query.filter_by(action='PASSWORD_RESET').first()
-            assert log is not None
+            resp = guest.post('/api/auth/password/reset/confirm', json={
+                'token': plain_token,
+                'new_password': 'auditlogtest1',
+            })
+            assert resp.status_code == 200
+            assert AuditLog.query.filter_by(action='PASSWORD_RESET').first() is not None
@@ -0,0 +1,135 @@
+"""
+Tests for the download queue service and its status stream.
+
+Covers:
+  - GET /api/events/<job_id> → 404 for unknown jobs
+  - Finished job → one data: event, then the stream closes
+  - update_download() pushes to subscribers; unsubscribe() drops them
+  - submit() runs tasks on daemon workers and logs ones that crash
+  - Playlist sessions run on their own pool, apart from single tracks
+  - The queue worker thread is started only once
+"""
+
+import json
+import logging
+import threading
+
+import pytest
+
+from app.services.queue_service import queue_service
+
+pytestmark = pytest.mark.usefixtures('db_session')
+
+
+@pytest.fixture
+def job_id():
+    """A fresh pending download job, dropped from the service afterwards."""
+    job_id = queue_service.create_download('https://youtu.be/dQw4w9WgXcQ', 'm4a', '320')
+    yield job_id
+    with queue_service.active_lock:
+        queue_service.active_downloads.pop(job_id, None)
+        queue_service.finished_at.pop(job_id, None)
+        queue_service.subscribers.pop(job_id, None)
+
+
+def _events(resp):
+    """Decode the data: events of a fully read SSE response."""
+    return [
+        json.loads(line[len('data: '):])
+        for line in resp.get_data(as_text=True).splitlines()
+        if line.startswith('data: ')
+    ]
+
+
+class TestStatusStream:
+    """GET /api/events/<job_id>."""
+
+    def test_unknown_job_404(self, admin_client):
+        resp = admin_client.get('/api/events/nosuchjob')
+        assert resp.status_code == 404
+
+    def test_finished_job_sends_one_event_and_closes(self, admin_client, job_id):
+        queue_service.update_download(job_id, status='completed')
+
+        resp = admin_client.get('/api/events/' + job_id)
+        assert resp.status_code == 200
+        assert resp.mimetype == 'text/event-stream'
+
+        # Reading the body only returns because the generator ended
+        events = _events(resp)
+        assert len(events) == 1
+        assert events[0]['status'] == 'completed'
+        assert job_id not in queue_service.subscribers
+
+
+class TestSubscribers:
+    """QueueService.subscribe / unsubscribe."""
+
+    def test_update_pushes_state_then_unsubscribe_removes(self, job_id):
+        subscriber = queue_service.subscribe(job_id)
+        # Primed with the state at subscribe time
+        assert subscriber.get_nowait()['status'] == 'pending'
+
+        queue_service.update_download(job_id, status='completed', progress=100)
+        pushed = subscriber.get_nowait()
+        assert pushed['status'] == 'completed'
+        assert pushed['progress'] == 100
+        assert subscriber.empty()
+
+        queue_service.unsubscribe(job_id, subscriber)
+        assert job_id not in queue_service.subscribers
+
+
+class TestWorkerPool:
+    """QueueService.submit on the shared download executor."""
+
+    def test_submit_returns_result(self):
+        future = queue_service.submit(lambda a, b: a + b, 2, 3)
+        assert future.result(timeout=5) == 5
+
+    def test_crashing_task_is_logged(self, caplog):
+        def crash():
+            raise RuntimeError('boom')
+
+        logged = threading.Event()
+        with caplog.at_level(logging.ERROR, logger='app.services.queue_service'):
+            future = queue_service.submit(crash)
+            # Done callbacks run in order, so this fires after the logging one
+            future.add_done_callback(lambda _: logged.set())
+            assert logged.wait(timeout=5)
+
+        assert isinstance(future.exception(), RuntimeError)
+        assert 'Background download task failed' in caplog.text
+        assert 'boom' in caplog.text
+
+    def test_workers_are_daemon_threads(self):
+        """Process exit must not wait for an in-flight download."""
+        thread_name = queue_service.submit(lambda: threading.current_thread().name)
+        worker = next(t for t in threading.enumerate()
+                      if t.name == thread_name.result(timeout=5))
+        assert worker.daemon
+
+    def test_playlist_sessions_do_not_block_single_tracks(self):
+        release = threading.Event()
+        try:
+            # Fill every playlist worker with a session that waits
+            busy = [queue_service.submit_playlist(release.wait, 5) for _ in range(4)]
+            assert queue_service.submit(lambda: 'track').result(timeout=5) == 'track'
+        finally:
+            release.set()
+        for future in busy:
+            assert future.result(timeout=5) is True
+
+
+class TestQueueWorker:
+    """QueueService._start_processing."""
+
+    def test_worker_started_once(self, app, monkeypatch):
+        monkeypatch.setattr(queue_service, '_app', queue_service._app)
+        for _ in range(3):
+            queue_service._start_processing(app)
+
+        workers = [t for t in threading.enumerate() if t.name == 'download-queue']
+        assert len(workers) == 1
+        assert workers[0].daemon
+        assert queue_service._app is app
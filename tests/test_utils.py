@@ -1,5 +1,7 @@
 """Tests for utility functions."""
 
+import shutil
+
 import pytest
 from app.utils import (
     is_valid_url,
@@ -11,50 +13,45 @@ from app.utils import (
 )
 
 
+PLAYLIST_ID = 'PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf'
+
+
 class TestIsValidUrl:
     """Test URL validation."""
     
-    def test_youtube_watch_url(self):
-        assert is_valid_url('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
-        assert is_valid_url('https://youtube.com/watch?v=dQw4w9WgXcQ')
-        assert is_valid_url('http://www.youtube.com/watch?v=dQw4w9WgXcQ')
-    
-    def test_youtube_short_url(self):
-        assert is_valid_url('https://youtu.be/dQw4w9WgXcQ')
-    
-    def test_youtube_music_url(self):
-        assert is_valid_url('https://music.youtube.com/watch?v=dQw4w9WgXcQ')
-    
-    def test_playlist_url(self):
-        assert is_valid_url('https://www.youtube.com/playlist?list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf')
-        assert is_valid_url('https://music.youtube.com/playlist?list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf')
-    
-    def test_invalid_urls(self):
-        assert not is_valid_url('')
-        assert not is_valid_url(None)
-        assert not is_valid_url('https://google.com')
-        assert not is_valid_url('https://vimeo.com/12345')
-        assert not is_valid_url('not a url')
+    @pytest.mark.parametrize('url,expected', [
+        ('https://www.youtube.com/watch?v=dQw4w9WgXcQ', True),
+        ('https://youtube.com/watch?v=dQw4w9WgXcQ', True),
+        ('http://www.youtube.com/watch?v=dQw4w9WgXcQ', True),
+        ('https://youtu.be/dQw4w9WgXcQ', True),
+        ('https://music.youtube.com/watch?v=dQw4w9WgXcQ', True),
+        (f'https://www.youtube.com/playlist?list={PLAYLIST_ID}', True),
+        (f'https://music.youtube.com/playlist?list={PLAYLIST_ID}', True),
+        ('', False),
+        (None, False),
+        ('https://google.com', False),
+        ('https://vimeo.com/12345', False),
+        ('not a url', False),
+    ])
+    def test_is_valid_url(self, url, expected):
+        assert is_valid_url(url) is expected
 
 
 class TestIsPlaylist:
     """Test playlist detection."""
     
-    def test_playlist_urls(self):
-        assert is_playlist('https://www.youtube.com/playlist?list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf')
-        assert is_playlist('https://music.youtube.com/playlist?list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf')
-    
-    def test_video_with_playlist(self):
+    @pytest.mark.parametrize('url,expected', [
+        (f'https://www.youtube.com/playlist?list={PLAYLIST_ID}', True),
+        (f'https://music.youtube.com/playlist?list={PLAYLIST_ID}', True),
         # Video URL with list parameter is treated as playlist
-        assert is_playlist('https://www.youtube.com/watch?v=abc&list=PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf')
-    
-    def test_single_video_urls(self):
-        assert not is_playlist('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
-        assert not is_playlist('https://youtu.be/dQw4w9WgXcQ')
-    
-    def test_invalid_inputs(self):
-        assert not is_playlist('')
-        assert not is_playlist(None)
+        (f'https://www.youtube.com/watch?v=abc&list={PLAYLIST_ID}', True),
+        ('https://www.youtube.com/watch?v=dQw4w9WgXcQ', False),
+        ('https://youtu.be/dQw4w9WgXcQ', False),
+        ('', False),
+        (None, False),
+    ])
+    def test_is_playlist(self, url, expected):
+        assert is_playlist(url) is expected
 
 
 class TestSanitizeFilename:
@@ -123,14 +120,28 @@ class TestFormatFilesize:
 class TestExtractVideoId:
     """Test video ID extraction."""
     
-    def test_watch_url(self):
-        assert extract_video_id('https://www.youtube.com/watch?v=dQw4w9WgXcQ') == 'dQw4w9WgXcQ'
-    
-    def test_short_url(self):
-        assert extract_video_id('https://youtu.be/dQw4w9WgXcQ') == 'dQw4w9WgXcQ'
-    
-    def test_with_extra_params(self):
-        assert extract_video_id('https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10') == 'dQw4w9WgXcQ'
+    @pytest.mark.parametrize('url,expected', [
+        ('https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+        ('https://youtu.be/dQw4w9WgXcQ', 'dQw4w9WgXcQ'),
+        ('https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10', 'dQw4w9WgXcQ'),
+        ('https://google.com', None),
+    ])
+    def test_extract_video_id(self, url, expected):
+        assert extract_video_id(url) == expected
+
+
+class TestStorageDirs:
+    """Test download directory resolution."""
     
-    def test_invalid_url(self):
-        assert extract_video_id('https://google.com') is None
+    def test_removed_dir_is_recreated(self, tmp_path, monkeypatch):
+        from app.storage_paths import get_download_dir, get_thumbnails_dir
+
+        music = tmp_path / 'music'
+        monkeypatch.setenv('ZORA_DOWNLOAD_DIR', str(music))
+        assert get_thumbnails_dir().is_dir()
+
+        # Storage cleaned up while the app is running
+        shutil.rmtree(music)
+        assert get_download_dir() == music
+        assert music.is_dir()
+        assert get_thumbnails_dir().is_dir()